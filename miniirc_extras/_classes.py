@@ -4,14 +4,25 @@
 #
 
 from __future__ import annotations
-import abc, collections, io, miniirc, sys, threading, types
+import abc, collections, functools, io, miniirc, sys, threading, types, warnings
 from collections.abc import Callable, Iterable
 from typing import Any, Optional, Union
 
-try:
-    from deprecated import deprecated # type: ignore
-except ImportError:
-    def deprecated(**kwargs): return lambda func : func
+# Emit a DeprecationWarning when a deprecated class is instantiated
+def deprecated(*, version: str, reason: str) -> Callable[[type], type]:
+    def decorator(cls: type) -> type:
+        msg = 'Call to deprecated class {}. ({}) -- Deprecated since ' \
+            'version {}.'.format(cls.__name__, reason, version)
+        old_init = cls.__init__ # type: ignore
+
+        @functools.wraps(old_init)
+        def __init__(self, *args, **kwargs) -> None:
+            warnings.warn(msg, category=DeprecationWarning, stacklevel=2)
+            old_init(self, *args, **kwargs)
+
+        cls.__init__ = __init__ # type: ignore
+        return cls
+    return decorator
 
 __all__ = ['AbstractIRC', 'DummyIRC', 'Hostmask', 'VersionInfo']
 
@@ -30,7 +41,9 @@ class _HostmaskMetaclass(type):
             return False
 
         # Make sure all arguments are str instances
-        return all(isinstance(i, str) for i in other)
+        nick, user, host = other
+        return isinstance(nick, str) and isinstance(user, str) and \
+            isinstance(host, str)
 
 # Create a hostmask class
 @_fix_name
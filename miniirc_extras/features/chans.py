@@ -127,6 +127,8 @@ class ModeList(dict):
 
 # Channels
 class Channel(AbstractChannel):
+    __slots__ = ('_irc', 'modes')
+
     # Alias for add_modes
     @property
     def add_modes(self) -> Callable[[str, Union[list[str], tuple[str]]], None]:
@@ -218,8 +220,8 @@ class ChannelTracker:
             args: list[str]) -> None:
         oldnick: str = hostmask[0].lower()
         user: User = self._users[args[0]]
-        prefixes: str = str(irc.isupport.get('PREFIX', 'Yqaohv'))
-        for chan in user.channels:
+        prefixes: str = self._status_modes
+        for chan in user.channels.values():
             if not isinstance(chan, Channel):
                 continue
             for mode in chan.modes:
@@ -261,15 +263,21 @@ class ChannelTracker:
             if not nick:
                 continue
 
-            user: User = self._users[Hostmask(nick, '???', '???')]
+            user: User = self._users._get_or_create_user(nick)
             user.add_to_channel(chan)
 
             for mode in modes:
                 chan.modes.add_modes('+' + mode, [nick])
 
     # Get the channel modes from the ISUPPORT
+    _status_modes: str = 'Yqaohv'
     def _handle_005(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
+        # Cache the status modes (for _handle_nick_) until the next ISUPPORT
+        if 'PREFIX' in irc.isupport:
+            self._status_modes = str(irc.isupport['PREFIX'])[1:].split(')',
+                1)[0]
+
         # Get the CHANMODES isupport
         if 'CHANMODES' not in irc.isupport:
             return
@@ -306,6 +314,7 @@ class ChannelTracker:
         # Load the (required) users feature
         irc.require('users')
         self._users = irc.users # type: ignore
+        self._users._chan_tracker = self
 
         # Add more handlers
         irc.CmdHandler(*self._mode_lists.keys())(self._parse_mode_lists)
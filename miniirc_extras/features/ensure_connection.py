@@ -34,7 +34,7 @@ class ConnectionEnsurer:
             self._old_interval = irc.ping_interval
 
         # Change the ping interval
-        get_raw_socket(irc).settimeout(interval)
+        self._set_interval(interval)
 
         # Wait for a PONG - This also makes the new ping interval work
         self._managers += 1
@@ -56,11 +56,23 @@ class ConnectionEnsurer:
         if self._managers > 0:
             self._managers -= 1
 
-        if not self._managers:
+        if not self._managers and self._old_interval is not None:
             try:
-                get_raw_socket(self._irc).settimeout(self._old_interval)
+                self._set_interval(self._old_interval)
             except error:
                 pass
+            self._old_interval = None
+
+    # Change the ping interval without making the socket raise timeouts.
+    #   Newer versions of miniirc use a non-blocking socket and wait for it to
+    #   become readable with select(), so irc.ping_interval can be changed
+    #   instead of converting the socket to a timed blocking one.
+    def _set_interval(self, interval: int) -> None:
+        sock = get_raw_socket(self._irc)
+        if sock.gettimeout() == 0:
+            self._irc.ping_interval = interval
+        else:
+            sock.settimeout(interval)
 
     # Set the new interval
     def __call__(self, interval: int = 2):
@@ -16,6 +16,9 @@ _not_implemented.__name__ = _not_implemented.__qualname__ = '(not implemented)'
 
 # Restricted IRC objects have less functions available
 class RestrictedIRC(AbstractIRC):
+    # Set in __init__, True if the original IRC object has a debug file.
+    _debug: bool
+
     # Send all irc.quote() and irc.debug() messages through the Queue.
     def quote(self, *msg: str, force: Optional[bool] = None,
             tags: Optional[dict[str, Union[str, bool]]] = None) -> None:
@@ -50,36 +53,26 @@ class RestrictedIRC(AbstractIRC):
     def __init__(self, orig: AbstractIRC, queue=None) -> None:
         if not isinstance(orig, AbstractIRC):
             raise TypeError('RestrictedIRC.__init__ expects an AbstractIRC.')
-        self.ip: str = orig.ip
-        self.port: int = orig.port
-        self.nick: str = orig.nick
-        self.channels: set[str] = orig.channels
-        self.ident: str = orig.ident
-        self.realname: str = orig.realname
-        self.ssl: Optional[bool] = orig.ssl
-        self.persist: bool = orig.persist
-        self.ircv3_caps: set[str] = orig.ircv3_caps
-        self.active_caps: set[str] = orig.active_caps
-        self.isupport: dict[str, Union[str, int]] = dict(orig.isupport)
-        self.connect_modes: Optional[str] = orig.connect_modes
-        self.quit_message: str = orig.quit_message or ''
-        self.ping_interval: int = orig.ping_interval
-        self.debug_file = None
-        self._debug: bool = bool(orig.debug_file)
-        self.verify_ssl: bool = orig.verify_ssl
+        # Bypass __setattr__ while copying attributes.
+        self.__dict__.update(ip=orig.ip, port=orig.port, nick=orig.nick,
+            channels=orig.channels, ident=orig.ident, realname=orig.realname,
+            ssl=orig.ssl, persist=orig.persist, ircv3_caps=orig.ircv3_caps,
+            active_caps=orig.active_caps, isupport=dict(orig.isupport),
+            connect_modes=orig.connect_modes,
+            quit_message=orig.quit_message or '',
+            ping_interval=orig.ping_interval, debug_file=None,
+            _debug=bool(orig.debug_file), verify_ssl=orig.verify_ssl)
 
         # __sendq has to be the last one set.
         self.__sendq = queue
 
 del _not_implemented
 
-# Multiprocessing - Don't send this or the actual IRC object to workers.
-@Feature('mp')
-class MultiprocessingFeature:
-    _thread_obj: Optional[threading.Thread] = None
-
+# A base class for features that run their own handlers somewhere other than
+#   miniirc's handler threads.
+class _PoolFeature:
     # Start a handler function - Mostly copied from miniirc
-    def _start_handler(self, irc: RestrictedIRC,
+    def _start_handler(self, irc: AbstractIRC,
             handlers: list[Callable[..., None]], command: str,
             hostmask: Hostmask, tags: dict[str, Union[str, bool]],
             args: list[str]) -> bool:
@@ -96,9 +89,17 @@ class MultiprocessingFeature:
                 params.insert(1, command)
 
             # Call the handler
-            a = self._pool.apply_async(handler, params)
+            self._submit(handler, params)
         return r
 
+    # Send a handler to the pool
+    def _submit(self, handler: Callable[..., None], params: list) -> None:
+        raise NotImplementedError
+
+    # Get the IRC object that handlers are called with
+    def _get_irc(self) -> AbstractIRC:
+        raise NotImplementedError
+
     # Override the handler function
     def _handle(self, cmd: str, hostmask: Hostmask, tags: dict[str,
             Union[str, bool]], args: list[str]) -> bool:
@@ -109,16 +110,18 @@ class MultiprocessingFeature:
                 hostmask = Hostmask(*hostmask)
 
             r: bool = False
-            irc: Optional[RestrictedIRC] = None
+            irc: Optional[AbstractIRC] = None
             for c in (cmd, None):
                 if c in self._handlers:
-                    irc = irc or RestrictedIRC(self._irc, self._queue)
+                    irc = irc or self._get_irc()
                     r = self._start_handler(irc, self._handlers[c], cmd,
                         hostmask, tags, args)
         except:
             traceback.print_exc()
 
-        res = type(self._irc)._handle(self._irc, cmd, hostmask, tags, args)
+        # Call the previous _handle() so that other features (and miniirc's
+        #   own handlers) still work.
+        res = self._orig_handle(cmd, hostmask, tags, args)
         return res or r
 
     def Handler(self, *events: str, colon: bool = True, ircv3: bool = False):
@@ -129,6 +132,25 @@ class MultiprocessingFeature:
         return miniirc._add_handler(self._handlers, events, ircv3, True,
             colon)
 
+    def __init__(self, irc: AbstractIRC) -> None:
+        self._irc = irc
+        self._handlers: dict[str, list[Callable[..., None]]] = {}
+        self._orig_handle: Callable[..., bool] = irc._handle # type: ignore
+        irc._handle = self._handle # type: ignore
+
+# Multiprocessing - Don't send this or the actual IRC object to workers.
+@Feature('mp')
+class MultiprocessingFeature(_PoolFeature):
+    _thread_obj: Optional[threading.Thread] = None
+
+    # Send a handler to the pool
+    def _submit(self, handler: Callable[..., None], params: list) -> None:
+        self._pool.apply_async(handler, params)
+
+    # Get the IRC object that handlers are called with
+    def _get_irc(self) -> AbstractIRC:
+        return RestrictedIRC(self._irc, self._queue)
+
     def _thread_raw(self) -> None:
         while self._irc.connected:
             try:
@@ -153,12 +175,10 @@ class MultiprocessingFeature:
         self._thread_obj.start()
 
     def __init__(self, irc: AbstractIRC) -> None:
-        self._irc = irc
         self._manager = manager = mp.Manager()
         self._queue = manager.Queue()
-        irc._handle = self._handle # type: ignore
         self._pool = mp.Pool()
-        self._handlers: dict[str, list[Callable[..., None]]] = {}
+        super().__init__(irc)
 
         # Start the message sending thread
         irc.Handler('001')(self._thread)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+#
+# Thread pool wrapper for miniirc
+#
+
+from __future__ import annotations
+import concurrent.futures
+from .. import AbstractIRC, Feature
+from .mp import _PoolFeature
+from collections.abc import Callable
+
+# Thread pools - Most IRC handlers are I/O bound, so handlers can be run in a
+#   fixed number of threads without having to pickle anything.
+@Feature('threadpool')
+class ThreadPoolFeature(_PoolFeature):
+    # Threads share memory, so handlers can use the real IRC object.
+    def _submit(self, handler: Callable[..., None], params: list) -> None:
+        self._executor.submit(handler, *params)
+
+    def _get_irc(self) -> AbstractIRC:
+        return self._irc
+
+    def __init__(self, irc: AbstractIRC) -> None:
+        self._executor = concurrent.futures.ThreadPoolExecutor()
+        super().__init__(irc)
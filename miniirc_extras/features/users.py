@@ -4,15 +4,21 @@
 #
 
 from __future__ import annotations
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Iterator
 from typing import Any, Optional, Union
 from .. import AbstractIRC, Feature, Hostmask
 
 json_types: tuple = (dict, list, tuple, str, int, float, bool, type(None))
 _ujson_types = Union[dict, list, tuple, str, int, float, bool, None]
 
-# Data
+# Data - Most users never have any data set, so they share one empty dict
+#   until __setitem__ is called.
+_empty_data: dict[str, _ujson_types] = {}
 class _Base:
+    __slots__ = ('_data',)
+    _data: dict[str, _ujson_types]
+
     # Get items
     def __getitem__(self, item: str) -> _ujson_types:
         return self._data[item]
@@ -31,6 +37,8 @@ class _Base:
         elif not isinstance(value, json_types):
             raise TypeError('{} data values must be JSON serializable.'.format(
                 type(self).__name__))
+        elif self._data is _empty_data:
+            self._data = {}
         self._data[item] = value
 
     def __delitem__(self, item: str) -> None:
@@ -48,31 +56,35 @@ class _Base:
 
     # Create the data dictionary
     def __init__(self) -> None:
-        self._data: dict[str, _ujson_types] = {}
+        self._data = _empty_data
 
 # Abstract channels
 class AbstractChannel(_Base):
-    # Check if a channel contains a user
+    __slots__ = ('id', 'name', 'topic', 'users')
+
+    # Check if a channel contains a user (or a nickname)
     def __contains__(self, item: Any) -> bool:
         if isinstance(item, User):
-            return item in self.users
+            return self.users.get(item.id) is item
+        elif isinstance(item, str):
+            return item.lower() in self.users
         return False
 
     # Add a user
     def add_user(self, user: User) -> None:
         if not isinstance(user, User):
             raise TypeError('add_user() requires a User.')
-        elif user not in self.users:
-            user.channels.add(self)
-            self.users.add(user)
+        elif user.id not in self.users:
+            user.channels[self.id] = self
+            self.users[user.id] = user
 
     # Remove a user
     def remove_user(self, user: User) -> None:
         if not isinstance(user, User):
             raise TypeError('remove_user() requires a User.')
-        elif user in self.users:
-            user.channels.remove(self)
-            self.users.remove(user)
+        elif self.users.get(user.id) is user:
+            del user.channels[self.id]
+            del self.users[user.id]
 
     # Get the representation
     def __repr__(self) -> str:
@@ -84,14 +96,15 @@ class AbstractChannel(_Base):
         self.id: str = name.lower()
         self.name: str = name
         self.topic: str = topic
-        self.users: set[User] = set()
+        self.users: dict[str, User] = {}
 
 Channel: Callable[[str, str, Optional[AbstractIRC]], AbstractChannel] = AbstractChannel
 
 # The user class
 class User(_Base):
-    account: Optional[str] = None
-    server: Optional[str] = None
+    __slots__ = ('id', 'nick', 'ident', 'host', '_irc', 'realname', 'channels',
+        'account', 'server')
+
     current_user: bool = False
 
     # Get the hostmask
@@ -195,13 +208,19 @@ class User(_Base):
         self.host: str = host
         self._irc: Optional[AbstractIRC] = irc
         self.realname: str = realname
-        self.channels: set[AbstractChannel] = set()
-        self.account  = account
+        self.channels: dict[str, AbstractChannel] = {}
+        self.account: Optional[str] = account
+        self.server: Optional[str] = None
 
 # The current user
 class CurrentUser(User):
+    __slots__ = ('_tracker',)
+
     current_user = True
 
+    # The minimum time (in seconds) between WHOIS requests for the same nick.
+    _whois_interval: float = 30
+
     @property
     def id(self):
         return self._irc.nick.lower()
@@ -226,46 +245,84 @@ class CurrentUser(User):
         irc: AbstractIRC = tracker._irc
         super().__init__(nick=irc.nick, irc=irc)
         self._tracker: UserTracker = tracker
+
+    # Send a WHOIS for the current user, unless one has been sent recently
+    #   (for example before a quick reconnect).
+    def _bootstrap(self) -> None:
+        tracker = self._tracker
+        irc = tracker._irc
+        nick = irc.nick.lower()
+        now = time.monotonic()
+        last = tracker._whois_times.get(nick)
+        if last is not None and now - last < self._whois_interval:
+            return
+
+        tracker._whois_times[nick] = now
         irc.quote('WHOIS', irc.nick)
 
+# Mark UserTracker functions as handlers, these are added to IRC objects in
+#   UserTracker.__init__.
+def _handler(*events: str, colon: bool = False) -> Callable[[Callable],
+        Callable]:
+    def decorator(func: Callable) -> Callable:
+        func._tracker_handler = (events, colon) # type: ignore
+        return func
+    return decorator
+
 # User tracker
 @Feature('users')
 class UserTracker:
-    # Check if a user exists
+    __slots__ = ('_irc', '_chans', '_users', '_chan_tracker', '_prefix_chars',
+        '_whois_times')
+    _irc: AbstractIRC
+    _chans: dict[str, AbstractChannel]
+    _users: dict[str, User]
+    _chan_tracker: Any
+    _prefix_chars: Optional[str]
+    _whois_times: dict[str, float]
+
+    # Check if a user exists - Strings are checked first as they are the
+    #   most common and isinstance(item, Hostmask) is relatively slow.
     def __contains__(self, item: Union[str, Hostmask, User]) \
             -> bool:
-        if isinstance(item, Hostmask):
-            item = item[0]
-
         if isinstance(item, str):
             return item.lower() in self._users
         elif isinstance(item, User):
-            return item in self._users.values()
+            return self._users.get(item.id) is item
+        elif isinstance(item, Hostmask):
+            return item[0].lower() in self._users
 
         return False
 
     # Get a user
     def __getitem__(self, item: Union[str, Hostmask, User]) -> User:
-        # Pass User objects through
-        if isinstance(item, User):
-            if item not in self._users.values():
-                raise KeyError(item)
-            return item
-
         # Handle strings
-        elif isinstance(item, str):
+        if isinstance(item, str):
             item = item.lower()
-            if item not in self._users:
+            user = self._users.get(item)
+            if user is None:
+                raise KeyError(item)
+            return user
+
+        # Pass User objects through
+        elif isinstance(item, User):
+            if self._users.get(item.id) is not item:
                 raise KeyError(item)
-            return self._users[item]
+            return item
 
         # Handle hostmasks
         elif isinstance(item, Hostmask):
-            id = item[0].lower()
-            if id not in self._users:
-                self._users[id] = User(*item, irc=self._irc)
+            return self._get_or_create_user(*item)
 
-            return self._users[id]
+    # Get a user, creating it if it does not exist
+    def _get_or_create_user(self, nick: str, ident: str = '???',
+            host: str = '???') -> User:
+        id = nick.lower()
+        user = self._users.get(id)
+        if user is None:
+            user = self._users[id] = User(nick, ident, host, irc=self._irc)
+
+        return user
 
     # Get a channel
     def Channel(self, name: str, topic: str = '') -> AbstractChannel:
@@ -280,20 +337,25 @@ class UserTracker:
         return res
 
     # Handle 001s
+    @_handler('001')
     def _handle_001(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
         self._chans.clear()
         self._users.clear()
+        self._prefix_chars = None
         user: CurrentUser = CurrentUser(self)
         self._users[user.id] = user
+        user._bootstrap()
 
     # Handle JOINs
+    @_handler('JOIN')
     def _handle_join(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
-        user: User = self[hostmask]
+        nick, ident, host = hostmask
+        user: User = self._get_or_create_user(nick, ident, host)
 
-        user.ident = hostmask[1]
-        user.host  = hostmask[2]
+        user.ident = ident
+        user.host  = host
 
         # Handle extended JOINs
         if 'extended-join' in irc.active_caps and len(args) > 2:
@@ -303,70 +365,104 @@ class UserTracker:
             user.account = '' if account == '*' else account
 
         # Add the user to the channel
-        user.add_to_channel(args[0])
+        self.Channel(args[0]).add_user(user)
 
         if user.current_user and 'userhost-in-names' not in irc.active_caps:
             irc.quote('WHO', args[0])
 
     # Handle PARTs
+    @_handler('PART')
     def _handle_part(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
-        self[hostmask].remove_from_channel(args[0])
+        self._remove_from_channel(hostmask[0], args[0])
 
     # Handle KICKs
+    @_handler('KICK')
     def _handle_kick(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
-        if args[1] in self:
-            self[args[1]].remove_from_channel(args[0])
+        self._remove_from_channel(args[1], args[0])
+
+    # Remove a user from a channel if both are known
+    def _remove_from_channel(self, nick: str, channel: str) -> None:
+        user = self._users.get(nick.lower())
+        chan = self._chans.get(channel.lower())
+        if user is not None and chan is not None:
+            chan.remove_user(user)
 
     # Handle QUITs (and 401s)
+    @_handler('QUIT')
     def _handle_quit(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
-        try:
-            user = self[hostmask[0]]
-        except KeyError:
-            return
-
         # Delete the user from the users list
-        del self._users[user.id]
+        id = hostmask[0].lower()
+        user = self._users.pop(id, None)
+        if user is None:
+            return
 
         # Remove the user from all channels
-        for chan in tuple(user.channels):
-            chan.remove_user(user)
+        for chan in user.channels.values():
+            chan.users.pop(id, None)
+        user.channels.clear()
 
     # Handle NICKs
+    @_handler('NICK')
     def _handle_nick(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
-        user = self[hostmask]
-        del self._users[hostmask[0].lower()]
+        old_id = hostmask[0].lower()
+        id = args[0].lower()
+
+        user = self._users.pop(old_id, None)
+        if user is None:
+            user = User(*hostmask, irc=self._irc)
         user.nick = args[0]
-        user.id   = args[0].lower()
-        self._users[user.id] = user
+        user.id   = id
+        self._users[id] = user
+
+        # Update the user's ID in channels, user.id can't be used here as
+        #   CurrentUser.id depends on irc.nick.
+        for chan in user.channels.values():
+            chan.users[id] = chan.users.pop(old_id, user)
 
         # Call the handler in chans.py
-        if hasattr(irc, 'chans'):
-            irc.chans._handle_nick_(irc, hostmask, args) # type: ignore
+        if self._chan_tracker:
+            self._chan_tracker._handle_nick_(irc, hostmask, args)
 
     # Handle WHO replies
+    @_handler('352')
     def _handle_352(self, irc: AbstractIRC, _: Hostmask,
             args: list[str]) -> None:
         channel: str = args[1]
 
-        user: User = self[Hostmask(args[5], '???', '???')]
+        user: User = self._get_or_create_user(args[5])
         user.ident = args[2]
         user.host = args[3]
         user.realname = args[-1].split(' ', 1)[-1]
         user.server = args[4]
 
         # Call the handler in chans.py
-        if hasattr(irc, 'chans'):
-            irc.chans._handle_352_(irc, _, args) # type: ignore
+        if self._chan_tracker:
+            self._chan_tracker._handle_352_(irc, _, args)
+
+    # Get the status prefixes from ISUPPORT, this is cached until the next
+    #   ISUPPORT (005) message.
+    def _get_prefix_chars(self, irc: AbstractIRC) -> str:
+        prefixes = self._prefix_chars
+        if prefixes is None:
+            prefixes = str(irc.isupport.get('PREFIX', ' !~&@+'))
+            prefixes = prefixes[1:].split(')', 1)[-1]
+            self._prefix_chars = prefixes
+        return prefixes
+
+    @_handler('005')
+    def _handle_005(self, irc: AbstractIRC, hostmask: Hostmask,
+            args: list[str]) -> None:
+        self._prefix_chars = None
 
     # Handle NAMES replies
+    @_handler('353')
     def _handle_353(self, irc: AbstractIRC, hostmask: Hostmask,
             args: list[str]) -> None:
-        prefixes = str(irc.isupport.get('PREFIX', ' !~&@+'))
-        prefixes = prefixes[1:].split(')', 1)[-1]
+        prefixes = self._get_prefix_chars(irc)
         for nick in args[-1].split(' '):
             nick = nick.lstrip(prefixes) # type: ignore
             if not nick:
@@ -380,27 +476,49 @@ class UserTracker:
                 if '@' in ident:
                     ident, host = ident.split('@', 1)
 
-            user: User = self[Hostmask(nick, ident, host)]
+            user: User = self._get_or_create_user(nick, ident, host)
             user.add_to_channel(args[-2])
 
         # Call the handler in chans.py
-        if hasattr(irc, 'chans'):
-            irc.chans._handle_353_(irc, hostmask, args) # type: ignore
+        if self._chan_tracker:
+            self._chan_tracker._handle_353_(irc, hostmask, args)
 
     def __repr__(self):
         return '<UserTracker ' + repr(self._users) + '>'
 
+    # A list of (attribute, events, colon) tuples, see below.
+    _handlers: tuple[tuple[str, tuple[str, ...], bool], ...] = ()
+
     # Add handlers
     def __init__(self, irc: AbstractIRC) -> None:
         assert not irc.connected, 'The "users" feature must be enabled' \
             ' before connecting to IRC!'
 
-        self._irc: AbstractIRC = irc
-        self._chans: dict[str, AbstractChannel] = {}
-        self._users: dict[str, User] = {}
+        self._irc = irc
+        self._chans = {}
+        self._users = {}
 
-        for attr in dir(self):
-            if attr.startswith('_handle_'):
-                irc.Handler(attr[8:].upper(), colon=False)(getattr(self, attr))
+        # The ChannelTracker (if any), this is set in chans.py.
+        self._chan_tracker = None
+
+        # The cached status prefixes, see _get_prefix_chars().
+        self._prefix_chars = None
+
+        # When the current user was last sent a WHOIS, see
+        #   CurrentUser._bootstrap().
+        self._whois_times = {}
+
+        for attr, events, colon in self._handlers:
+            irc.Handler(*events, colon=colon)(getattr(self, attr))
 
         irc.Handler('401')(self._handle_quit)
+
+# Get a list of functions marked with @_handler().
+def _get_handlers() -> Iterator[tuple[str, tuple[str, ...], bool]]:
+    for attr, func in vars(UserTracker).items():
+        if hasattr(func, '_tracker_handler'):
+            events, colon = func._tracker_handler
+            yield attr, events, colon
+
+UserTracker._handlers = tuple(_get_handlers())
+del _get_handlers
@@ -9,7 +9,7 @@
 #
 
 from __future__ import annotations
-import enum, re
+import enum, functools, re
 from typing import Optional, Union
 
 class _Code(int):
@@ -29,8 +29,14 @@ class _Code(int):
 
 class _CodeEnum(_Code, enum.Enum): # type: ignore
     __slots__ = ()
+    def __init__(self, *args) -> None:
+        self._str: str = str(self.value)
+
     def __str__(self) -> str:
-        return str(self.value)
+        return self._str
+
+    def __call__(self, text: str) -> str:
+        return f'\x03{self._str}{text}\x0399'
 
     def __hash__(self) -> int:
         return hash(self.value)
@@ -109,46 +115,65 @@ colourise = colorize
 _ocol = Optional[_col]
 class Styler:
     __slots__ = ('fg', 'bg', 'bold', 'italics', 'underline', 'reverse_color',
-        'reverse_colour', 'strikethrough', 'spoiler', 'monospace', 'reset')
+        'reverse_colour', 'strikethrough', 'spoiler', 'monospace', 'reset',
+        '_start', '_end')
 
-    # Add a control character to text
-    def _wrap(self, text: str, char: str) -> str:
+    # Add a control character (and the character that resets it)
+    def _wrap(self, start: list[str], end: list[str], char: str) -> None:
+        start.append(char)
         if not self.reset:
-            return char + text
+            return
         elif char.startswith('\x03'):
             if ',' in char:
-                return char + text + '\x0399,99'
+                end.append('\x0399,99')
             else:
-                return char + text + '\x0399'
-
-        return char + text + char
+                end.append('\x0399')
+        else:
+            end.append(char)
 
-    def __call__(self, text: str) -> str:
-        text = str(text)
+    # Work out which control characters to add before and after text
+    def _update_codes(self) -> None:
+        # Control characters are added from the innermost one outwards.
+        start: list[str] = []
+        end: list[str] = []
 
         if self.reverse_colour:
-            text = self._wrap(text, _codes.reverse_colour)
+            self._wrap(start, end, _codes.reverse_colour)
 
         if self.bg:
-            text = self._wrap(text, '\x03{},{}'.format(self.fg
+            self._wrap(start, end, '\x03{},{}'.format(self.fg
                 or colours.default, self.bg))
         elif self.fg:
-            text = self._wrap(text, '\x03' + str(self.fg))
+            self._wrap(start, end, '\x03' + str(self.fg))
 
         if self.bold:
-            text = self._wrap(text, _codes.bold)
+            self._wrap(start, end, _codes.bold)
         if self.italics:
-            text = self._wrap(text, _codes.italics)
+            self._wrap(start, end, _codes.italics)
         if self.underline:
-            text = self._wrap(text, _codes.underline)
+            self._wrap(start, end, _codes.underline)
         if self.strikethrough:
-            text = self._wrap(text, _codes.strikethrough)
+            self._wrap(start, end, _codes.strikethrough)
         if self.spoiler:
-            text = _codes.spoiler + text + _codes.spoiler
+            start.append(_codes.spoiler)
+            end.append(_codes.spoiler)
         if self.monospace:
-            text = self._wrap(text, _codes.monospace)
+            self._wrap(start, end, _codes.monospace)
 
-        return text
+        start.reverse()
+        self._start: Optional[str] = ''.join(start)
+        self._end: str = ''.join(end)
+
+    def __call__(self, text: str) -> str:
+        if self._start is None:
+            self._update_codes()
+        return self._start + str(text) + self._end # type: ignore
+
+    # Forget the cached control characters when the style is changed
+    def __setattr__(self, attr: str, value) -> None:
+        super().__setattr__(attr, value)
+        if attr != '_start' and attr != '_end':
+            super().__setattr__('_start', None)
 
     def __init__(self, fg: _ocol = None, bg: _ocol = None, *,
             bold: bool = False, italics: bool = False, underline: bool = False,
@@ -181,9 +206,6 @@ class _LightweightStyler(Styler):
         return '<Styler object: {} {}>'.format(self.name,
             repr(str(self.char)))
 
-    def __call__(self, text: str) -> str:
-        return self.char + str(text) + self.char
-
     def __init__(self, name: str, char: Optional[str] = None):
         self.name: str = name
         if char is None:
@@ -195,6 +217,7 @@ class _LightweightStyler(Styler):
         if name in Styler.__slots__:
             kwargs[name] = True
         super().__init__(**kwargs) # type: ignore
+        self._start = self._end = char
 
 # Create a few lightweight stylers
 bold            = _LightweightStyler('bold')
@@ -207,24 +230,39 @@ strikethrough   = _LightweightStyler('strikethrough')
 monospace       = _LightweightStyler('monospace')
 spoiler         = _LightweightStyler('spoiler')
 
+# Cache Stylers created by style(), the same styles tend to be used repeatedly.
+#   Colours are passed as member names since colours members can't be hashed.
+@functools.lru_cache(maxsize=256)
+def _get_styler(fg: Optional[str], bg: Optional[str], bold: bool,
+        italics: bool, underline: bool, reverse_colour: bool,
+        strikethrough: bool, spoiler: bool, monospace: bool,
+        reset: bool) -> Styler:
+    return Styler(fg and colours[fg], bg and colours[bg], bold=bold,
+        italics=italics, underline=underline, reverse_colour=reverse_colour,
+        strikethrough=strikethrough, spoiler=spoiler, monospace=monospace,
+        reset=reset)
+
 # Create a nicer function
 def style(text: str, fg: _ocol = None, bg: _ocol = None, *,
         bold: bool = False, italics: bool = False, underline: bool = False,
         reverse_colour: bool = False, reverse_color: bool = False,
         strikethrough: bool = False, spoiler: bool = False,
         monospace: bool = False, reset: bool = True) -> str:
-    styler = Styler(fg, bg, bold=bold, italics=italics, underline=underline,
-        reverse_colour=reverse_colour, reverse_color=reverse_color,
-        strikethrough=strikethrough, spoiler=spoiler, monospace=monospace,
-        reset=reset)
+    # Normalise colours so that 'red' and colours.red share a Styler.
+    styler = _get_styler(_get_code(fg).name if fg else None,
+        _get_code(bg).name if bg else None, bold, italics, underline,
+        reverse_colour or reverse_color, strikethrough, spoiler, monospace,
+        reset)
     return styler(text)
 
 # Remove all formatting from text
-_unstyle_re = None
-def unstyle(text: str) -> str:
-    global _unstyle_re
-    if not _unstyle_re:
-        _unstyle_re = re.compile(r'\x03([0-9]{1,2})?(,[0-9]{1,2})?|['
-            + ''.join(code for code in _codes if len(code) == 1) + ']')
+_single_codes = ''.join(code for code in _codes if len(code) == 1)
+_unstyle_re = re.compile(r'\x03([0-9]{1,2})?(,[0-9]{1,2})?|['
+    + _single_codes + ']')
 
+def unstyle(text: str) -> str:
+    # All formatting codes are control characters, so printable strings can
+    #   be returned as-is without running the regex.
+    if text.isprintable():
+        return text
     return _unstyle_re.sub('', text)
@@ -4,33 +4,41 @@
 #
 
 from __future__ import annotations
-import collections, functools, miniirc, re, socket
+import collections, functools, miniirc, socket
 from . import AbstractIRC, error as _error, Hostmask
 from ._classes import _DummyIRC as DummyIRC, _namedtuple as namedtuple, \
     VersionInfo, deprecated
 from ._numerics import numerics
-from collections.abc import Callable
-from typing import Optional, Union
+from collections.abc import Callable, Iterable
+from typing import Any, Optional, Union
 
 __all__ = ['DummyIRC', 'dict_to_tags', 'tags_to_dict', 'ircv3_message_parser',
-    'hostmask_to_str', 'ircv2_message_unparser', 'ircv3_message_unparser',
-    'namedtuple']
+    'hostmask_to_str', 'ircv2_message_unparser', 'ircv2_message_unparser_many',
+    'ircv3_message_unparser', 'namedtuple']
 
 if namedtuple.__module__.endswith('._classes'):
     namedtuple.__name__ = namedtuple.__qualname__ = 'namedtuple'
     namedtuple.__module__ = __name__
     namedtuple.__doc__ = collections.namedtuple.__doc__
 
-# Copy "internal functions" from miniirc
-dict_to_tags = miniirc._dict_to_tags
-dict_to_tags.__module__ = __name__
-dict_to_tags.__name__ = dict_to_tags.__qualname__ = 'dict_to_tags'
-dict_to_tags.__doc__ = """
-Converts a dict containing strings and booleans into an IRCv3 tags string.
-Example:
-    dict_to_tags({'tag1': True, 'tag2': 'tag-data'})
-    Return value: b'@tag1;tag2=tag-data '
-"""
+# Bots tend to send the same tags over and over again, so cache the encoded
+# tags. The items are kept in a tuple so that their order is preserved.
+_dict_to_tags = miniirc._dict_to_tags
+@functools.lru_cache(maxsize=256)
+def _cached_dict_to_tags(items: tuple) -> bytes:
+    return _dict_to_tags(dict(items))
+
+def dict_to_tags(tags: dict[str, Union[str, bool]]) -> bytes:
+    """
+    Converts a dict containing strings and booleans into an IRCv3 tags string.
+    Example:
+        dict_to_tags({'tag1': True, 'tag2': 'tag-data'})
+        Return value: b'@tag1;tag2=tag-data '
+    """
+    try:
+        return _cached_dict_to_tags(tuple(tags.items()))
+    except TypeError:
+        return _dict_to_tags(tags)
 
 try:
     _tags_to_dict = miniirc._tags_to_dict
@@ -91,8 +99,9 @@ def hostmask_to_str(hostmask: _hostmask) -> str:
     if not isinstance(hostmask, Hostmask):
         raise TypeError('hostmask_to_str() expects a Hostmask object.')
 
-    return '{}!{}@{}'.format(hostmask[0].replace('!', '_').replace('@', '_'),
-        hostmask[1].replace('@', '_'), hostmask[2])
+    nick = hostmask[0].replace('!', '_').replace('@', '_')
+    ident = hostmask[1].replace('@', '_')
+    return f'{nick}!{ident}@{hostmask[2]}'
 
 # Replace invalid RFC1459 characters with Unicode lookalikes
 def _prune_arg(arg):
@@ -100,26 +109,10 @@ def _prune_arg(arg):
         arg = '\u0703' + arg[1:]
     return arg.replace(' ', '\xa0').replace('\r', '\xa0').replace('\n', '\xa0')
 
-# Convert miniirc-parsed messages back to IRCv2 messages
-def ircv2_message_unparser(cmd: str, hostmask: _hostmask, tags: dict[str,
-        Union[str, bool]], args: list[str], *, colon: bool = True,
-        encoding: Optional[str] = 'utf-8') -> Union[bytes, str]:
-    """
-    Converts miniirc-style message data into an IRCv2 message encoded with
-    encoding (or None to return a str). When colon is False, args[-1] will have
-    a colon prepended to it.
-    """
-
-    res: list = []
-    if hostmask and not any(i == cmd for i in hostmask):
-        res.append(':{}!{}@{}'.format(*hostmask))
-
-    # Add a unicode lookalike to cmd
-    if cmd.startswith('@'):
-        cmd = '\uff20' + cmd[1:]
-    res.append(_prune_arg(cmd))
-
-    # Add the arguments list
+# Add the arguments list to an unparsed message, then encode it and strip
+# newlines
+def _finish_message(res: list[str], args: list[str], colon: bool,
+        encoding: Optional[str]) -> Union[bytes, str]:
     if len(args) > 0:
         res.extend(map(_prune_arg, args[:-1]))
         if colon:
@@ -127,7 +120,6 @@ def ircv2_message_unparser(cmd: str, hostmask: _hostmask, tags: dict[str,
         else:
             res.append(':' + args[-1])
 
-    # Encode and strip newlines
     if not encoding:
         return ' '.join(res).replace('\r', ' ').replace('\n', ' ')
 
@@ -135,6 +127,44 @@ def ircv2_message_unparser(cmd: str, hostmask: _hostmask, tags: dict[str,
     raw = raw.replace(b'\r', b' ').replace(b'\n', b' ')
     return raw
 
+# Convert the hostmask and command
+def _unparse_prefix(cmd: str, hostmask: _hostmask) -> list[str]:
+    res: list = []
+    if hostmask and cmd not in hostmask:
+        res.append(f':{hostmask[0]}!{hostmask[1]}@{hostmask[2]}')
+
+    # Add a unicode lookalike to cmd
+    if cmd.startswith('@'):
+        cmd = '\uff20' + cmd[1:]
+    res.append(_prune_arg(cmd))
+    return res
+
+# Convert miniirc-parsed messages back to IRCv2 messages
+def ircv2_message_unparser(cmd: str, hostmask: _hostmask, tags: dict[str,
+        Union[str, bool]], args: list[str], *, colon: bool = True,
+        encoding: Optional[str] = 'utf-8') -> Union[bytes, str]:
+    """
+    Converts miniirc-style message data into an IRCv2 message encoded with
+    encoding (or None to return a str). When colon is False, args[-1] will have
+    a colon prepended to it.
+    """
+    return _finish_message(_unparse_prefix(cmd, hostmask), args, colon,
+        encoding)
+
+# The same as above, but for multiple argument lists
+def ircv2_message_unparser_many(cmd: str, hostmask: _hostmask,
+        tags: dict[str, Union[str, bool]], args_list: Iterable[list[str]], *,
+        colon: bool = True, encoding: Optional[str] = 'utf-8') \
+        -> list[Union[bytes, str]]:
+    """
+    The same as ircv2_message_unparser, but returns a list containing one
+    message for every list of arguments in args_list. The command and hostmask
+    are only converted once.
+    """
+    prefix = _unparse_prefix(cmd, hostmask)
+    return [_finish_message(prefix.copy(), args, colon, encoding)
+        for args in args_list]
+
 # Extend the previous function for IRCv3
 def ircv3_message_unparser(cmd: str, hostmask: _hostmask, tags: dict[str,
         Union[str, bool]], args: list[str], *, colon: bool = True,
@@ -145,10 +175,12 @@ def ircv3_message_unparser(cmd: str, hostmask: _hostmask, tags: dict[str,
 
     if not tags:
         return res
-    elif isinstance(res, bytes):
-        return dict_to_tags(tags) + res
+
+    raw_tags = dict_to_tags(tags)
+    if encoding:
+        return raw_tags + res # type: ignore
     else:
-        return dict_to_tags(tags).decode('utf-8', 'replace') + res
+        return raw_tags.decode('utf-8', 'replace') + res # type: ignore
 
 # Get the raw socket from an IRC object
 def get_raw_socket(irc: AbstractIRC) -> socket.socket:
@@ -193,25 +225,42 @@ def irc_from_url(url: str, **kwargs) -> AbstractIRC:
     Creates AbstractIRC objects based on the URL and keyword arguments provided.
     """
 
-    if '://' not in url:
+    scheme, sep, url2 = url.partition('://')
+    if not sep:
         raise URLError('Invalid URL.')
-    scheme, url2 = url.split('://', 1)
     scheme = scheme.lower()
-    if scheme not in _schemes:
+    func = _schemes.get(scheme)
+    if func is None:
         raise URLError('Unknown scheme ' + repr(scheme) + '.')
 
-    return _schemes[scheme](url2, **kwargs)
+    return func(url2, **kwargs)
+
+# Parse [nick@]host[:port][/channels][?query] URLs, missing parts are returned
+#   as empty strings.
+def _parse_irc_url(url: str) -> Optional[tuple[str, str, str, str]]:
+    url = url.partition('?')[0]
+    host, _, chans = url.partition('/')
+    nick, at, ip = host.partition('@')
+    if not at:
+        nick, ip = '', host
+    elif not nick or '@' in ip:
+        return None
+
+    ip, colon, raw_port = ip.partition(':')
+    if not ip or colon and not (raw_port.isdigit() and raw_port.isascii()):
+        return None
+
+    return nick, ip, raw_port, chans
 
 # Create the default IRC schemes
-_irc_scheme_re = re.compile(
-    r'^(?:([^@/]+)@)?([^@/:]+)(?:\:([0-9]+))?(?:/([^\?]+))?(?:/?\?.*)?$')
+_chan_prefixes = frozenset('#&+!')
 @register_url_scheme('ircs')
 def _ircs_scheme(url: str, ssl: Optional[bool] = True, **kwargs) \
         -> miniirc.IRC:
-    match = _irc_scheme_re.match(url)
-    if not match:
+    parsed = _parse_irc_url(url)
+    if not parsed:
         raise URLError('Invalid IRC URL.')
-    nick, ip, raw_port, chans = match.groups()
+    nick, ip, raw_port, chans = parsed
 
     nick = nick or kwargs.get('nick', '')
     if 'nick' in kwargs:
@@ -226,35 +275,37 @@ def _ircs_scheme(url: str, ssl: Optional[bool] = True, **kwargs) \
     elif 'port' in kwargs:
         port = kwargs.pop('port')
 
-    channels: set = set(kwargs.pop('channels', ()))
+    # miniirc.IRC() converts this to a set itself
+    channels: list = list(kwargs.pop('channels', ()))
     if chans:
         for chan in chans.split(','):
             if not chan:
                 continue
-            elif chan[0].isalnum():
+            elif chan[0] not in _chan_prefixes:
                 chan = '#' + chan
-            channels.add(chan)
+            channels.append(chan)
 
     return miniirc.IRC(ip, port, nick, channels, ssl=ssl, **kwargs)
 
 # irc:// and ircu://
-@register_url_scheme('irc')
-def _irc_scheme(url: str, ssl: Optional[bool] = None, **kwargs) -> miniirc.IRC:
-    return _ircs_scheme(url, ssl=ssl, **kwargs)
-
-@register_url_scheme('ircu')
-def _ircu_scheme(url: str, port: int = 6667, ssl: Optional[bool] = False,
-        **kwargs) -> miniirc.IRC:
-    return _ircs_scheme(url, port=port, ssl=ssl, **kwargs)
+_irc_scheme = register_url_scheme('irc')(functools.partial(_ircs_scheme,
+    ssl=None))
+_ircu_scheme = register_url_scheme('ircu')(functools.partial(_ircs_scheme,
+    port=6667, ssl=False))
 
 # Because I am too lazy to put this in miniirc_discord
+_miniirc_discord: Any = None
 @register_url_scheme('discord')
 def _discord_scheme(url: str, port: int = 0, **kwargs) -> AbstractIRC:
-    try:
-        import miniirc_discord # type: ignore
-    except ImportError as e:
-        raise URLError('miniirc_discord is required to handle Discord URLs.') \
-            from e
+    global _miniirc_discord
+    miniirc_discord = _miniirc_discord
+    if miniirc_discord is None:
+        try:
+            import miniirc_discord # type: ignore
+        except ImportError as e:
+            raise URLError('miniirc_discord is required to handle Discord '
+                'URLs.') from e
+        _miniirc_discord = miniirc_discord
     url = url.split('/', 1)[0]
     return miniirc_discord.Discord(url, 0, kwargs.pop('nick', 'unknown'),
         **kwargs)
@@ -289,7 +340,7 @@ class HandlerGroup:
     def _add_handler(self, events: tuple[str, ...], cmd_arg: bool, colon: bool,
             ircv3: bool) -> Callable[[Callable], Callable]:
         def _finish_handler(func: Callable) -> Callable:
-            self._handlers.add(_Handler(func, events, cmd_arg, colon, ircv3))
+            self._handlers.append(_Handler(func, events, cmd_arg, colon, ircv3))
             return func
 
         return _finish_handler
@@ -314,7 +365,10 @@ class HandlerGroup:
         handler group.
         """
         if isinstance(group, HandlerGroup):
-            group._handlers.update(self._handlers)
+            if group is not self:
+                existing = set(map(id, group._handlers))
+                group._handlers.extend(handler for handler in self._handlers
+                    if id(handler) not in existing)
         elif not hasattr(group, 'Handler'):
             raise TypeError('add_to() expects a HandlerGroup-like object, not '
                 + type(group).__name__)
@@ -326,9 +380,9 @@ class HandlerGroup:
     def copy(self) -> HandlerGroup:
         """ Returns a copy of the HandlerGroup. """
         group = HandlerGroup()
-        group._handlers.update(self._handlers)
+        group._handlers.extend(self._handlers)
         return group
 
     # Add self._handlers
     def __init__(self):
-        self._handlers: set[_Handler] = set()
+        self._handlers: list[_Handler] = []